@@ -0,0 +1,268 @@
+# ensemble.py
+
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+from sklearn.decomposition import PCA
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from utils.hashing import hash_inputs
+from utils.instrumentation import instrument
+
+####################################################################################################
+# Ensemble of nowcast models combined with weights from shared time series CV folds.
+#
+# A member is a dict describing one model:
+#     {"name": "factor-7p-2pc", "model": "factor", "columns": [...], "n_components": 2}
+#     {"name": "bridge-3p", "model": "bridge", "columns": [...]}
+# 'factor' members are the StandardScaler + PCA + LinearRegression pipeline of train_and_predict,
+# 'bridge' members regress PCE on the proxies directly.
+
+MODELS = ("factor", "bridge")
+
+
+def proxy_members(proxies_path="./results/final_dataset/pce_alternative_proxies.csv",
+                  sizes=(3, 5, 7), n_components=(1, 2, 3)):
+    """
+    Builds member specs from the ranked proxies: for each subset of the top-n proxies, one
+    bridge model and one factor model per number of components.
+
+    Factor models keeping as many components as there are proxies are skipped: PCA with every
+    component followed by OLS is the bridge model, which would then be counted twice.
+    """
+    proxies = pd.read_csv(proxies_path)
+    ranked = proxies.sort_values("Correlation", key=np.abs, ascending=False)["Name"].tolist()
+
+    members = []
+    for size in sizes:
+        columns = ranked[:size]
+        members.append({"name": f"bridge-{size}p", "model": "bridge", "columns": columns})
+        for k in n_components:
+            if k < size:
+                members.append(
+                    {"name": f"factor-{size}p-{k}pc", "model": "factor", "columns": columns, "n_components": k}
+                )
+    return members
+
+
+def _make_pipeline(member):
+    if member["model"] == "factor":
+        return make_pipeline(StandardScaler(), PCA(member["n_components"]), LinearRegression())
+    if member["model"] == "bridge":
+        return make_pipeline(StandardScaler(), LinearRegression())
+    raise ValueError(f"model must be one of {MODELS}, got '{member['model']}'")
+
+
+def _fit_member(member, X_train, y_train, X_test, folds):
+    """
+    Fits one member on every fold and on the full training set.
+    """
+    X_train = X_train[member["columns"]]
+    X_test = X_test[member["columns"]]
+
+    oof_predictions = []
+    fold_mse = []
+    for train_index, test_index in folds:
+        pipeline = _make_pipeline(member)
+        pipeline.fit(X_train.iloc[train_index], y_train.iloc[train_index])
+        predictions = pipeline.predict(X_train.iloc[test_index])
+        oof_predictions.append(predictions)
+        fold_mse.append(np.mean((y_train.iloc[test_index].to_numpy() - predictions) ** 2))
+
+    pipeline = _make_pipeline(member)
+    pipeline.fit(X_train, y_train)
+
+    return {
+        "oof_predictions": np.concatenate(oof_predictions),
+        "fold_mse": np.array(fold_mse),
+        "test_predictions": pipeline.predict(X_test),
+    }
+
+
+def _simplex_least_squares(predictions, y):
+    """
+    Least squares weights constrained to be non-negative and to sum to one.
+    """
+    n_members = predictions.shape[1]
+
+    def objective(weights):
+        residuals = predictions @ weights - y
+        return residuals @ residuals, 2 * predictions.T @ residuals
+
+    result = minimize(
+        objective,
+        np.full(n_members, 1.0 / n_members),
+        jac=True,
+        method="SLSQP",
+        bounds=[(0.0, 1.0)] * n_members,
+        constraints=[{"type": "eq", "fun": lambda weights: weights.sum() - 1.0}],
+    )
+
+    # Clean up solver round-off so the weights are exactly on the simplex
+    weights = np.clip(result.x, 0.0, None)
+    return weights / weights.sum()
+
+
+def _combination_weights(method, fold_mse, oof_predictions, y_oof):
+    """
+    Combination weights from per-fold member MSEs (folds x members) and out-of-fold predictions.
+    """
+    if method == "inverse_mse":
+        weights = 1.0 / fold_mse.mean(axis=0)
+        return weights / weights.sum()
+    if method == "stacking":
+        return _simplex_least_squares(oof_predictions, y_oof)
+    raise ValueError(f"method must be 'inverse_mse' or 'stacking', got '{method}'")
+
+
+class NowcastEnsemble:
+    """
+    Fits member models in parallel on shared time series CV folds and combines their nowcasts.
+
+    Member results are cached on (data, member spec), in memory and optionally on disk, so
+    adding a member to an existing ensemble only fits that member.
+
+    Parameters:
+    - X_train, y_train, X_test: As returned by prepare_data.
+    - n_splits: Number of TimeSeriesSplit folds shared by all members.
+    - n_jobs: Number of parallel jobs for fitting members (joblib convention, -1 for all cores).
+    - cache_dir: Optional directory for cached member results.
+    """
+
+    def __init__(self, X_train, y_train, X_test, n_splits=5, n_jobs=-1, cache_dir=None):
+        self.X_train = X_train
+        self.y_train = y_train
+        self.X_test = X_test
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self.members = []
+
+        self.folds = list(TimeSeriesSplit(n_splits=n_splits).split(X_train))
+        self.y_oof = np.concatenate([y_train.iloc[test_index].to_numpy() for _, test_index in self.folds])
+        self._fold_sizes = [len(test_index) for _, test_index in self.folds]
+        self._data_key = hash_inputs(X_train, y_train, X_test, n_splits)
+        self._results = {}
+
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _member_key(self, member):
+        return hash_inputs(self._data_key, sorted(member.items()))
+
+    def add_members(self, members):
+        """
+        Adds member specs; they are fitted on the next call to fit.
+        """
+        names = {member["name"] for member in self.members}
+        for member in members:
+            if member["name"] in names:
+                raise ValueError(f"duplicate member name '{member['name']}'")
+            names.add(member["name"])
+            self.members.append(member)
+        return self
+
+    @instrument(name="NowcastEnsemble.fit")
+    def fit(self):
+        """
+        Fits the members that have no cached result, in parallel.
+
+        Returns:
+        - list: Names of the members that were fitted.
+        """
+        pending = []
+        for member in self.members:
+            key = self._member_key(member)
+            if key in self._results:
+                continue
+
+            cache_path = os.path.join(self.cache_dir, f"{key}.pkl") if self.cache_dir is not None else None
+            if cache_path is not None and os.path.exists(cache_path):
+                self._results[key] = joblib.load(cache_path)
+            else:
+                pending.append((member, key, cache_path))
+
+        results = joblib.Parallel(n_jobs=self.n_jobs)(
+            joblib.delayed(_fit_member)(member, self.X_train, self.y_train, self.X_test, self.folds)
+            for member, _, _ in pending
+        )
+
+        for (member, key, cache_path), result in zip(pending, results):
+            self._results[key] = result
+            if cache_path is not None:
+                joblib.dump(result, cache_path)
+
+        return [member["name"] for member, _, _ in pending]
+
+    def _stacked(self, field):
+        return np.column_stack([self._results[self._member_key(member)][field] for member in self.members])
+
+    def weights(self, method="inverse_mse"):
+        """
+        Combination weights of the members from all CV folds, summing to one. These are the
+        weights used by predict.
+
+        Parameters:
+        - method: 'inverse_mse' weights each member by 1 / its average CV MSE; 'stacking' finds
+          the convex combination (non-negative weights summing to one) of the out-of-fold
+          predictions with the smallest squared error against the actual PCE values.
+
+        Returns:
+        - pandas.Series indexed by member name.
+        """
+        weights = _combination_weights(
+            method, self._stacked("fold_mse"), self._stacked("oof_predictions"), self.y_oof
+        )
+        return pd.Series(weights, index=[member["name"] for member in self.members], name="weight")
+
+    def predict(self, method="inverse_mse"):
+        """
+        Returns the combined nowcast for X_test.
+        """
+        return self._stacked("test_predictions") @ self.weights(method).to_numpy()
+
+    def ensemble_fold_mse(self, method="inverse_mse"):
+        """
+        MSE of the combined out-of-fold predictions on each fold, comparable to the mse_scores
+        of perform_time_series_cv (e.g. for generate_cv_performance_markdown).
+
+        The weights for fold k are fitted on folds 1 to k - 1 only, so no fold is scored with
+        weights that have seen it; fold 1 has no earlier folds and uses equal weights.
+        """
+        fold_mse = self._stacked("fold_mse")
+        oof_predictions = self._stacked("oof_predictions")
+        bounds = np.concatenate([[0], np.cumsum(self._fold_sizes)])
+
+        scores = []
+        for k in range(len(self.folds)):
+            start, end = bounds[k], bounds[k + 1]
+            if k == 0:
+                weights = np.full(len(self.members), 1.0 / len(self.members))
+            else:
+                weights = _combination_weights(
+                    method, fold_mse[:k], oof_predictions[:start], self.y_oof[:start]
+                )
+
+            errors = oof_predictions[start:end] @ weights - self.y_oof[start:end]
+            scores.append(float(np.mean(errors**2)))
+        return scores
+
+    def cv_table(self, method="inverse_mse"):
+        """
+        Per member CV MSE for every fold, the average MSE and the combination weight.
+        """
+        fold_mse = self._stacked("fold_mse").T
+        table = pd.DataFrame(
+            fold_mse,
+            index=[member["name"] for member in self.members],
+            columns=[f"fold_{i + 1}" for i in range(len(self.folds))],
+        )
+        table["mean_mse"] = table.mean(axis=1)
+        table["weight"] = self.weights(method)
+        return table.sort_values("mean_mse")
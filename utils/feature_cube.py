@@ -0,0 +1,193 @@
+# feature_cube.py
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.instrumentation import stage
+
+####################################################################################################
+# Lag / lead features of the monthly panel for nowcasting.
+#
+# Lag k of an indicator at anchor month t is its value in month t - k, so negative lags are
+# leads. For a quarterly target anchored at the last month of the quarter, lags 1 and 2 are the
+# earlier months of the same quarter and leads are months released after the quarter ends.
+
+
+def load_monthly_panel(file_path="./results/fred/fred_monthly_orig.csv"):
+    """
+    Loads the monthly FRED-MD panel with a monthly PeriodIndex and float columns.
+    """
+    panel = pd.read_csv(file_path, index_col=0)
+    panel.index = pd.PeriodIndex(panel.index, freq="M")
+    return panel.astype(float)
+
+
+def _to_monthly_periods(index):
+    """
+    Converts a panel or target index to monthly periods.
+
+    Accepts a PeriodIndex, a DatetimeIndex, or integers / strings in 'YYYYMM' format (as in
+    final_proxy_dataset.csv read without parse_dates).
+    """
+    if isinstance(index, pd.PeriodIndex):
+        return index.asfreq("M")
+    if isinstance(index, pd.DatetimeIndex):
+        return index.to_period("M")
+
+    if pd.api.types.is_integer_dtype(index) or pd.api.types.is_object_dtype(index) or pd.api.types.is_string_dtype(index):
+        try:
+            return pd.to_datetime(index.astype(str), format="%Y%m").to_period("M")
+        except (ValueError, TypeError) as error:
+            raise ValueError(
+                "index must be a PeriodIndex, a DatetimeIndex or 'YYYYMM' values"
+            ) from error
+
+    raise ValueError(
+        f"index must be a PeriodIndex, a DatetimeIndex or 'YYYYMM' values, got {index.dtype}"
+    )
+
+
+def _lag_label(column, lag):
+    if lag == 0:
+        return f"{column} (t)"
+    if lag > 0:
+        return f"{column} (t-{lag})"
+    return f"{column} (t+{-lag})"
+
+
+class FeatureCube:
+    """
+    (date, series, lag) view over a monthly panel, with cached design matrices.
+
+    The cube is a strided view of the panel values, so building it costs no memory
+    regardless of the number of lags. Design matrices are only materialised for the requested
+    lags, columns and window, and cached on that key.
+
+    Parameters:
+    - panel: Monthly DataFrame (dates x series). Pass a transformed panel for modelling. The
+      index can be anything nowcast_dataset accepts for the target; months missing from it are
+      added as NaN rows.
+    - max_lag: Largest lag available in the cube.
+    - max_lead: Largest lead available in the cube.
+    """
+
+    def __init__(self, panel, max_lag=2, max_lead=0):
+        months = _to_monthly_periods(panel.index)
+        if months.has_duplicates:
+            raise ValueError(f"panel has duplicate months: {months[months.duplicated()].unique().astype(str).tolist()}")
+
+        # Lags are positional, so missing months are filled in as NaN rows to keep the range contiguous
+        index = pd.period_range(months.min(), months.max(), freq="M")
+        panel = panel.set_axis(months).reindex(index)
+
+        self.max_lag = max_lag
+        self.max_lead = max_lead
+        self.columns = pd.Index(panel.columns)
+        self.values = np.ascontiguousarray(panel.to_numpy(dtype=float))
+
+        # Anchor dates are the months for which every lag and lead exists in the panel
+        self.dates = index[max_lag:len(index) - max_lead]
+        self._column_positions = {column: i for i, column in enumerate(self.columns)}
+        self._date_positions = pd.Series(np.arange(len(self.dates)), index=self.dates)
+        self._cache = {}
+
+    @property
+    def lags(self):
+        """Lags along the last axis of view, from the largest lead to the largest lag."""
+        return np.arange(-self.max_lead, self.max_lag + 1)
+
+    @property
+    def view(self):
+        """
+        Zero-copy array of shape (dates, series, lags), where
+        view[d, s, i] is series s in month dates[d] - lags[i].
+        """
+        window = self.max_lag + self.max_lead + 1
+        windows = sliding_window_view(self.values, window, axis=0)
+
+        # Windows run forward in time, reverse them so the last axis runs from lead to lag
+        return windows[:, :, ::-1]
+
+    def design_matrix(self, lags=(0,), columns=None, window=None):
+        """
+        Materialises the features for a set of lags, columns and anchor dates.
+
+        Results are cached on (lags, columns, window); treat the returned DataFrame as read-only.
+
+        Parameters:
+        - lags: Lags to include (negative values are leads), each within [-max_lead, max_lag].
+        - columns: Series to include; defaults to all.
+        - window: Optional (start, end) anchor months, inclusive, e.g. ('1981-01', '2022-12').
+
+        Returns:
+        - DataFrame indexed by anchor month with one '<series> (t-k)' column per series and lag.
+        """
+        lags = tuple(int(lag) for lag in lags)
+        columns = tuple(self.columns) if columns is None else tuple(columns)
+        window = tuple(window) if window is not None else None
+        key = (lags, columns, window)
+
+        if key in self._cache:
+            return self._cache[key]
+
+        for lag in lags:
+            if not -self.max_lead <= lag <= self.max_lag:
+                raise ValueError(
+                    f"lag {lag} outside of the cube range [{-self.max_lead}, {self.max_lag}]"
+                )
+
+        dates = self._date_positions
+        if window is not None:
+            dates = dates.loc[window[0]:window[1]]
+
+        column_positions = [self._column_positions[column] for column in columns]
+        lag_positions = [lag + self.max_lead for lag in lags]
+
+        with stage("FeatureCube.design_matrix", self.values):
+            # A single fancy-indexing gather copies only the requested block out of the view
+            block = self.view[np.ix_(dates.to_numpy(), column_positions, lag_positions)]
+            design = pd.DataFrame(
+                block.reshape(len(dates), -1),
+                index=dates.index,
+                columns=[_lag_label(column, lag) for column in columns for lag in lags],
+            )
+
+        self._cache[key] = design
+        return design
+
+    def nowcast_dataset(self, target, lags=(0, 1, 2), columns=None, window=None, dropna=True):
+        """
+        Joins the lag/lead features onto a target observed at the end of each period.
+
+        The result has the same index as target, with the target as the first column, so it can
+        go straight into prepare_data, train_and_predict or perform_time_series_cv.
+
+        Parameters:
+        - target: Series indexed by dates (e.g. quarter-end PCE); each date is matched to its month.
+          The index can be a PeriodIndex, a DatetimeIndex or 'YYYYMM' integers / strings.
+        - lags, columns, window: See design_matrix.
+        - dropna: Drop dates for which the target or any feature is missing.
+
+        Returns:
+        - DataFrame with the target and the features.
+        """
+        design = self.design_matrix(lags, columns, window)
+
+        target_months = _to_monthly_periods(target.index)
+
+        # Guard against a target that does not line up with the features at all
+        if not target_months.isin(design.index).any():
+            covered = f"{design.index[0]} to {design.index[-1]}" if len(design.index) else "no dates"
+            raise ValueError(
+                f"none of the target months ({target_months.min()} to {target_months.max()}) "
+                f"match the feature dates ({covered}); check the target index and window"
+            )
+
+        features = design.reindex(target_months)
+        features.index = target.index
+
+        dataset = pd.concat([target, features], axis=1)
+        if dropna:
+            dataset = dataset.dropna()
+        return dataset
@@ -0,0 +1,32 @@
+# hashing.py
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+####################################################################################################
+# Digests of pipeline inputs for on-disk caches
+
+
+def hash_inputs(*inputs):
+    """
+    Returns a stable digest of DataFrames, Series, arrays and plain values, used as a cache key
+    (e.g. for report sections and ensemble members).
+    """
+    digest = hashlib.sha256()
+
+    for item in inputs:
+        if isinstance(item, (pd.DataFrame, pd.Series)):
+            # Hash values, index and labels so that renamed columns also count as changes
+            digest.update(pd.util.hash_pandas_object(item, index=True).to_numpy().tobytes())
+            labels = item.columns if isinstance(item, pd.DataFrame) else [item.name]
+            digest.update(repr(list(labels)).encode())
+        elif isinstance(item, np.ndarray):
+            digest.update(str(item.dtype).encode() + str(item.shape).encode())
+            digest.update(np.ascontiguousarray(item).tobytes())
+        else:
+            digest.update(repr(item).encode())
+        digest.update(b"\x00")
+
+    return digest.hexdigest()
@@ -0,0 +1,255 @@
+# instrumentation.py
+
+import cProfile
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+from datetime import datetime
+
+import pandas as pd
+
+####################################################################################################
+# Opt-in timing and memory instrumentation for pipeline stages and plot functions.
+#
+# Nothing is recorded until enable() is called; while disabled, instrumented functions go
+# straight to the wrapped function and stage() returns a shared no-op context manager.
+#
+#     from utils.instrumentation import enable, MemorySink, JsonLinesSink
+#     memory = MemorySink()
+#     enable(sinks=[memory, JsonLinesSink("./results/timings.jsonl")], profile_dir="./results/profiles")
+#     ... run the pipeline ...
+#     memory.summary()
+#
+# tracemalloc keeps a single process-wide peak, so peak memory is only recorded for stages run
+# on the main thread; stages in other threads report None.
+
+_ENABLED = False
+_SINKS = []
+_PROFILE_DIR = None
+_TRACE_MEMORY = False
+_STARTED_TRACEMALLOC = False
+_NULL_CONTEXT = nullcontext()
+_STATE = threading.local()
+_PROFILE_COUNTER = itertools.count(1)
+
+
+class JsonLinesSink:
+    """
+    Appends every stage record as one JSON line to a file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, record):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+class MemorySink:
+    """
+    Keeps stage records in memory and summarises them per stage.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def summary(self):
+        """
+        Returns a DataFrame with call counts, total/mean wall time, total CPU time and the
+        largest peak memory per stage, sorted by total wall time.
+        """
+        columns = ["calls", "wall_time_s", "mean_wall_time_s", "cpu_time_s", "peak_memory_mb"]
+        if not self.records:
+            return pd.DataFrame(columns=columns)
+
+        records = pd.DataFrame(self.records)
+        summary = records.groupby("stage").agg(
+            calls=("wall_time_s", "size"),
+            wall_time_s=("wall_time_s", "sum"),
+            mean_wall_time_s=("wall_time_s", "mean"),
+            cpu_time_s=("cpu_time_s", "sum"),
+            peak_memory_mb=("peak_memory_mb", "max"),
+        )
+        return summary.sort_values("wall_time_s", ascending=False)
+
+
+def enable(sinks=None, profile_dir=None, trace_memory=True):
+    """
+    Turns instrumentation on.
+
+    Parameters:
+    - sinks: List of callables receiving one dict per finished stage. Defaults to a single MemorySink.
+    - profile_dir: If given, each outermost stage is run under cProfile and dumped to
+      '<profile_dir>/<stage>-<n>.prof'.
+    - trace_memory: Record peak memory with tracemalloc, for stages run on the main thread only.
+      This slows allocations down noticeably.
+
+    Returns:
+    - list: The active sinks.
+    """
+    global _ENABLED, _SINKS, _PROFILE_DIR, _TRACE_MEMORY, _STARTED_TRACEMALLOC
+
+    _SINKS = list(sinks) if sinks is not None else [MemorySink()]
+    _PROFILE_DIR = profile_dir
+    _TRACE_MEMORY = trace_memory
+
+    if profile_dir is not None:
+        os.makedirs(profile_dir, exist_ok=True)
+
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _STARTED_TRACEMALLOC = True
+
+    _ENABLED = True
+    return _SINKS
+
+
+def disable():
+    """
+    Turns instrumentation off and stops tracemalloc if enable() started it.
+    """
+    global _ENABLED, _STARTED_TRACEMALLOC
+
+    _ENABLED = False
+    if _STARTED_TRACEMALLOC:
+        tracemalloc.stop()
+        _STARTED_TRACEMALLOC = False
+
+
+def is_enabled():
+    return _ENABLED
+
+
+def _shapes(values):
+    """
+    Returns the shapes of all array-like values (DataFrames, Series, numpy arrays).
+    """
+    return [list(value.shape) for value in values if hasattr(value, "shape")]
+
+
+class _Stage:
+    """
+    Context manager measuring a single stage and sending the record to the sinks.
+    """
+
+    def __init__(self, name, input_shapes):
+        self.name = name
+        self.input_shapes = input_shapes
+
+    def __enter__(self):
+        stack = getattr(_STATE, "stack", None)
+        if stack is None:
+            stack = _STATE.stack = []
+        self.parent = stack[-1] if stack else None
+        self.child_peak = 0
+        stack.append(self)
+
+        # Only the outermost stage is profiled, cProfile does not nest
+        self.profiler = None
+        if _PROFILE_DIR is not None and not any(s.profiler for s in stack[:-1]):
+            self.profiler = cProfile.Profile()
+
+        # The tracemalloc peak is shared by all threads, so only the main thread can measure it
+        self.trace_memory = (
+            _TRACE_MEMORY
+            and tracemalloc.is_tracing()
+            and threading.current_thread() is threading.main_thread()
+        )
+        if self.trace_memory:
+            self.start_memory, peak = tracemalloc.get_traced_memory()
+
+            # reset_peak() would lose the parent's peak so far, so hand it to the parent first
+            if self.parent is not None:
+                self.parent.child_peak = max(self.parent.child_peak, peak)
+            tracemalloc.reset_peak()
+
+        self.started_at = datetime.now().isoformat(timespec="milliseconds")
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profiler is not None:
+            self.profiler.disable()
+        wall_time = time.perf_counter() - self.wall_start
+        cpu_time = time.process_time() - self.cpu_start
+
+        peak_memory_mb = None
+        if self.trace_memory:
+            # reset_peak() is shared by nested stages, so children report their peaks upwards
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self.child_peak)
+            peak_memory_mb = (peak - self.start_memory) / 1e6
+            if self.parent is not None:
+                self.parent.child_peak = max(self.parent.child_peak, peak)
+
+        _STATE.stack.pop()
+
+        record = {
+            "stage": self.name,
+            "started_at": self.started_at,
+            "wall_time_s": wall_time,
+            "cpu_time_s": cpu_time,
+            "peak_memory_mb": peak_memory_mb,
+            "input_shapes": self.input_shapes,
+            "failed": exc_type is not None,
+        }
+
+        if self.profiler is not None:
+            # The counter is process-wide so profiles from different threads never overwrite each other
+            record["profile"] = os.path.join(_PROFILE_DIR, f"{self.name}-{next(_PROFILE_COUNTER)}.prof")
+            self.profiler.dump_stats(record["profile"])
+
+        for sink in _SINKS:
+            sink(record)
+        return False
+
+
+def stage(name, *inputs):
+    """
+    Context manager recording a named pipeline stage.
+
+    Parameters:
+    - name: Stage name used in the records.
+    - inputs: Optional arrays/DataFrames whose shapes are recorded.
+
+    Example:
+        with stage("interpolate", joined_dataset):
+            joined_dataset = joined_dataset.interpolate()
+    """
+    if not _ENABLED:
+        return _NULL_CONTEXT
+    return _Stage(name, _shapes(inputs))
+
+
+def instrument(func=None, *, name=None):
+    """
+    Decorator recording every call of a function as a stage.
+
+    The shapes of all array-like positional and keyword arguments are recorded as input shapes.
+    Can be used as @instrument or @instrument(name="stage name").
+    """
+    if func is None:
+        return functools.partial(instrument, name=name)
+
+    stage_name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _ENABLED:
+            return func(*args, **kwargs)
+        with _Stage(stage_name, _shapes(args) + _shapes(kwargs.values())):
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -63,31 +63,19 @@ The cross-validation process provides an estimate of the model's prediction erro
     return markdown_content
 
 
-from IPython.display import Markdown, display
+from utils.report_builder import render_markdown_conclusions
 
 def generate_markdown_conclusions(row,df):
-    
-    indicator_details = df.loc[row['Indicator']]
-    
-    md_text = f"""
-<div style="color:#FF7F50">
+    """
+    Displays the markdown conclusions for a single indicator in a notebook.
 
----
+    For many indicators, use utils.report_builder.render_markdown_conclusions on the whole
+    results table instead, which renders every row in one pass and does not need IPython.
+    """
+    # Imported lazily so the module can be used outside of a notebook
+    from IPython.display import Markdown, display
 
-**{row['Indicator']}**
-
-</div>
-
-- **Correlation with PCE**: {indicator_details['Correlation']:.3f}, indicating {"a strong" if abs(indicator_details['Correlation']) > 0.5 else "a weak"} relationship with PCE.
-- **R²**: {row['R^2']:.3f}: This indicator explains approximately {row['R^2'] * 100:.1f}% of the variance in PCE, indicating {"a strong" if row['R^2'] > 0.5 else "a weaker"} linear relationship.
-- **Coefficient**: {row['Coefficient']:.3f}: {"The coefficient is statistically significant, suggesting a meaningful impact on PCE." if row['P-Value'] < 0.05 else "The coefficient is not statistically significant, suggesting a less reliable impact on PCE."}
-- **P-Value**: {row['P-Value']:.2e} : {"The relationship is statistically significant, strongly rejecting the null hypothesis of no association." if row['P-Value'] < 0.05 else "The relationship is not statistically significant, failing to reject the null hypothesis of no association."}
-- **Stationarity**: {indicator_details['Conclusion']}, confirming the data {"does" if indicator_details['Conclusion'] == "Stationary" else "does not"} exhibit constant mean and variance over time.
-- **Durbin-Watson**: {row['Durbin-Watson']:.3f}: {"There is minimal autocorrelation in the residuals, indicating independence of observations." if 1.5 < row['Durbin-Watson'] < 2.5 else "There may be autocorrelation in the residuals, which could affect the model's assumptions."}
-- **Jarque-Bera (JB) Statistic and P-Value**: {row['JB Statistic']:.2f}, {row['JB P-Value']:.2e}: {"The residuals appear to be normally distributed, supporting the model's assumptions." if row['JB P-Value'] > 0.05 else "The residuals do not appear to be normally distributed, indicating potential issues with the model."}
-
-
-"""
+    md_text = render_markdown_conclusions(row.to_frame().T, df)
     display(Markdown(md_text))
 
-    # - **VIF**: {indicator_details['VIF']:.2f}, suggesting {"significant" if indicator_details['VIF'] > 5 else "minimal"} multicollinearity.
\ No newline at end of file
+    # - **VIF**: {indicator_details['VIF']:.2f}, suggesting {"significant" if indicator_details['VIF'] > 5 else "minimal"} multicollinearity.
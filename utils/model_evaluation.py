@@ -0,0 +1,40 @@
+# model_evaluation.py
+
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.decomposition import PCA
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.metrics import mean_squared_error
+
+from utils.instrumentation import instrument, stage
+
+
+@instrument
+def perform_time_series_cv(X, y, n_components=2, n_splits=5):
+    """
+    Performs time series cross-validation and returns MSE scores.
+    """
+    # Initialize the TimeSeriesSplit object
+    tscv = TimeSeriesSplit(n_splits=n_splits)
+
+    mse_scores = []
+
+    for train_index, test_index in tscv.split(X):
+        # Use different variable names for the train/test splits to avoid modifying the original datasets
+        X_train_fold, X_test_fold = X.iloc[train_index], X.iloc[test_index]
+        y_train_fold, y_test_fold = y.iloc[train_index], y.iloc[test_index]
+
+        with stage("perform_time_series_cv.fold", X_train_fold, X_test_fold):
+            # Create and fit the pipeline
+            pipeline = make_pipeline(
+                StandardScaler(), PCA(n_components=n_components), LinearRegression()
+            )
+            pipeline.fit(X_train_fold, y_train_fold)
+
+            # Make predictions and calculate MSE
+            predictions = pipeline.predict(X_test_fold)
+            mse = mean_squared_error(y_test_fold, predictions)
+        mse_scores.append(mse)
+
+    return mse_scores
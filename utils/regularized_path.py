@@ -0,0 +1,197 @@
+# regularized_path.py
+
+import numpy as np
+import pandas as pd
+
+from sklearn.linear_model import ElasticNet, Lasso, Ridge, enet_path
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from utils.instrumentation import instrument, stage
+
+####################################################################################################
+# Regularised regression paths over all transformed indicators, as an alternative to PCA.
+#
+# All paths are computed on standardised predictors and a centred target, which matches
+# StandardScaler followed by sklearn's Ridge / Lasso / ElasticNet with an intercept, so the
+# selected alpha can be used directly in a regular sklearn pipeline.
+
+PENALTIES = ("ridge", "lasso", "elasticnet")
+
+
+def _standardize(X, y):
+    """
+    Standardises X (population std, as StandardScaler does) and centres y.
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    x_mean = X.mean(axis=0)
+    x_scale = X.std(axis=0)
+    x_scale[x_scale == 0] = 1.0
+    y_mean = y.mean()
+
+    return (X - x_mean) / x_scale, y - y_mean, x_mean, x_scale, y_mean
+
+
+def default_alphas(X, y, penalty="ridge", l1_ratio=0.5, n_alphas=50):
+    """
+    Returns a decreasing, log-spaced grid of alphas for the given penalty.
+
+    For lasso / elastic net the grid starts at the smallest alpha that sets every coefficient
+    to zero; for ridge it is scaled by the number of observations.
+    """
+    Xs, yc, _, _, _ = _standardize(X, y)
+    n_samples = Xs.shape[0]
+
+    if penalty == "ridge":
+        return np.logspace(2, -4, n_alphas) * n_samples
+
+    if penalty == "lasso":
+        l1_ratio = 1.0
+    alpha_max = np.abs(Xs.T @ yc).max() / (n_samples * l1_ratio)
+    return np.logspace(np.log10(alpha_max), np.log10(alpha_max * 1e-3), n_alphas)
+
+
+def regularization_path(X, y, penalty="ridge", alphas=None, l1_ratio=0.5, max_iter=10000):
+    """
+    Fits the whole regularisation path.
+
+    Ridge uses a single SVD of the standardised predictors and gets every alpha from it in
+    closed form. Lasso and elastic net use sklearn's coordinate descent path, which warm-starts
+    each alpha from the previous solution, with the Gram matrix computed once.
+
+    Parameters:
+    - X: Predictors (DataFrame or array), no missing values.
+    - y: Target.
+    - penalty: 'ridge', 'lasso' or 'elasticnet'.
+    - alphas: Regularisation strengths; defaults to default_alphas.
+    - l1_ratio: Elastic net mixing parameter (ignored for ridge and lasso).
+    - max_iter: Maximum coordinate descent iterations per alpha (ignored for ridge).
+
+    Returns:
+    - dict with 'alphas' (decreasing), 'coefs' (n_alphas x n_features, in standardised units),
+      and the 'x_mean', 'x_scale' and 'y_mean' needed for predict_path.
+    """
+    if penalty not in PENALTIES:
+        raise ValueError(f"penalty must be one of {PENALTIES}, got '{penalty}'")
+
+    if alphas is None:
+        alphas = default_alphas(X, y, penalty, l1_ratio)
+    alphas = np.sort(np.asarray(alphas, dtype=float))[::-1]
+
+    Xs, yc, x_mean, x_scale, y_mean = _standardize(X, y)
+
+    if penalty == "ridge":
+        # One decomposition gives every alpha: w(alpha) = V diag(s / (s^2 + alpha)) U^T y
+        U, s, Vt = np.linalg.svd(Xs, full_matrices=False)
+        Uty = U.T @ yc
+        shrinkage = s / (s**2 + alphas[:, None])
+        coefs = (shrinkage * Uty) @ Vt
+    else:
+        if penalty == "lasso":
+            l1_ratio = 1.0
+        gram = Xs.T @ Xs
+        Xy = Xs.T @ yc
+        _, coefs, _ = enet_path(
+            Xs, yc, l1_ratio=l1_ratio, alphas=alphas, precompute=gram, Xy=Xy, max_iter=max_iter
+        )
+        coefs = coefs.T
+
+    return {
+        "alphas": alphas,
+        "coefs": coefs,
+        "x_mean": x_mean,
+        "x_scale": x_scale,
+        "y_mean": y_mean,
+    }
+
+
+def predict_path(path, X):
+    """
+    Predicts with every alpha of a path at once.
+
+    Returns:
+    - numpy.ndarray of shape (n_samples, n_alphas).
+    """
+    Xs = (np.asarray(X, dtype=float) - path["x_mean"]) / path["x_scale"]
+    return Xs @ path["coefs"].T + path["y_mean"]
+
+
+@instrument
+def time_series_cv_path(X, y, penalty="ridge", alphas=None, l1_ratio=0.5, n_splits=5, max_iter=10000):
+    """
+    Time series cross-validation of the whole path.
+
+    Each fold is decomposed (ridge) or its Gram matrix computed (lasso / elastic net) once, and
+    all alphas are scored from that, instead of refitting the model once per alpha and fold.
+
+    Returns:
+    - DataFrame indexed by alpha with the MSE of every fold plus 'mean_mse' and 'std_mse'.
+    """
+    if alphas is None:
+        alphas = default_alphas(X, y, penalty, l1_ratio)
+    alphas = np.sort(np.asarray(alphas, dtype=float))[::-1]
+
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    tscv = TimeSeriesSplit(n_splits=n_splits)
+
+    fold_mse = {}
+    for i, (train_index, test_index) in enumerate(tscv.split(X)):
+        with stage("time_series_cv_path.fold", X[train_index]):
+            path = regularization_path(X[train_index], y[train_index], penalty, alphas, l1_ratio, max_iter)
+            predictions = predict_path(path, X[test_index])
+            fold_mse[f"fold_{i + 1}"] = ((predictions - y[test_index, None]) ** 2).mean(axis=0)
+
+    cv_results = pd.DataFrame(fold_mse, index=pd.Index(alphas, name="alpha"))
+    cv_results["mean_mse"] = cv_results[list(fold_mse)].mean(axis=1)
+    cv_results["std_mse"] = cv_results[list(fold_mse)].std(axis=1)
+    return cv_results
+
+
+@instrument
+def train_and_predict_regularized(X_train, y_train, X_test, penalty="ridge", alphas=None, l1_ratio=0.5, n_splits=5, max_iter=10000):
+    """
+    Selects alpha by time series cross-validation, then trains the model and makes predictions.
+
+    Drop-in alternative to train_and_predict that uses all indicators instead of a handful of
+    principal components. The returned pipeline can be passed to plot_fan_chart.
+
+    Parameters:
+    - X_train: Training data features (e.g. all indicators of joined_dataset_transformed.csv).
+    - y_train: Training data target variable.
+    - X_test: Test data features.
+    - penalty: 'ridge', 'lasso' or 'elasticnet'.
+    - alphas: Regularisation strengths to search; defaults to default_alphas on X_train.
+    - l1_ratio: Elastic net mixing parameter.
+    - n_splits: Number of time series cross-validation splits.
+    - max_iter: Maximum coordinate descent iterations (lasso / elastic net).
+
+    Returns:
+    - pipeline: StandardScaler + Ridge/Lasso/ElasticNet fitted with the selected alpha.
+    - predicted_pce: Predictions for the test set.
+    - cv_results: Cross-validated MSE per alpha, see time_series_cv_path.
+    """
+    if alphas is None:
+        alphas = default_alphas(X_train, y_train, penalty, l1_ratio)
+
+    cv_results = time_series_cv_path(X_train, y_train, penalty, alphas, l1_ratio, n_splits, max_iter)
+    best_alpha = cv_results["mean_mse"].idxmin()
+
+    if penalty == "ridge":
+        regressor = Ridge(alpha=best_alpha)
+    elif penalty == "lasso":
+        regressor = Lasso(alpha=best_alpha, max_iter=max_iter)
+    else:
+        regressor = ElasticNet(alpha=best_alpha, l1_ratio=l1_ratio, max_iter=max_iter)
+
+    pipeline = Pipeline([
+        ("scaler", StandardScaler()),
+        ("regressor", regressor),
+    ])
+    pipeline.fit(X_train, y_train)
+    predicted_pce = pipeline.predict(X_test)
+
+    return pipeline, predicted_pce, cv_results
@@ -0,0 +1,268 @@
+# report_builder.py
+
+import hashlib
+import json
+import os
+import string
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils.hashing import hash_inputs
+from utils.instrumentation import instrument
+
+####################################################################################################
+# Templates
+
+CONCLUSION_TEMPLATE = """
+<div style="color:#FF7F50">
+
+---
+
+**{indicator}**
+
+</div>
+
+- **Correlation with PCE**: {correlation:.3f}, indicating {correlation_strength} relationship with PCE.
+- **R²**: {r2:.3f}: This indicator explains approximately {r2_pct:.1f}% of the variance in PCE, indicating {r2_strength} linear relationship.
+- **Coefficient**: {coefficient:.3f}: {coefficient_text}
+- **P-Value**: {p_value:.2e} : {p_value_text}
+- **Stationarity**: {stationarity}, confirming the data {stationarity_text} exhibit constant mean and variance over time.
+- **Durbin-Watson**: {durbin_watson:.3f}: {durbin_watson_text}
+- **Jarque-Bera (JB) Statistic and P-Value**: {jb_statistic:.2f}, {jb_p_value:.2e}: {jb_text}
+
+
+"""
+
+
+# (if true, if false) phrases for the conditional fields of CONCLUSION_TEMPLATE
+CONCLUSION_PHRASES = {
+    "correlation_strength": ("a strong", "a weak"),
+    "r2_strength": ("a strong", "a weaker"),
+    "coefficient_text": (
+        "The coefficient is statistically significant, suggesting a meaningful impact on PCE.",
+        "The coefficient is not statistically significant, suggesting a less reliable impact on PCE.",
+    ),
+    "p_value_text": (
+        "The relationship is statistically significant, strongly rejecting the null hypothesis of no association.",
+        "The relationship is not statistically significant, failing to reject the null hypothesis of no association.",
+    ),
+    "stationarity_text": ("does", "does not"),
+    "durbin_watson_text": (
+        "There is minimal autocorrelation in the residuals, indicating independence of observations.",
+        "There may be autocorrelation in the residuals, which could affect the model's assumptions.",
+    ),
+    "jb_text": (
+        "The residuals appear to be normally distributed, supporting the model's assumptions.",
+        "The residuals do not appear to be normally distributed, indicating potential issues with the model.",
+    ),
+}
+
+
+def compile_template(template):
+    """
+    Parses a str.format style template once into (literal, field, format_spec) parts.
+
+    Parameters:
+    - template: Template string with named {field:spec} placeholders.
+
+    Returns:
+    - list of (literal, field, format_spec) tuples; field is None for trailing text.
+    """
+    return [
+        (literal, field, spec)
+        for literal, field, spec, _ in string.Formatter().parse(template)
+    ]
+
+
+def render_template(compiled, table):
+    """
+    Renders a compiled template for every row of a table, one column at a time.
+
+    Parameters:
+    - compiled: Output of compile_template.
+    - table: DataFrame with one column per template field.
+
+    Returns:
+    - pandas.Series of rendered strings, indexed like table.
+    """
+    rendered = pd.Series("", index=table.index, dtype=object)
+
+    for literal, field, spec in compiled:
+        rendered = rendered + literal
+        if field is None:
+            continue
+
+        # Format the whole column in one go rather than row by row
+        formatter = ("{:" + spec + "}").format if spec else str
+        rendered = rendered + table[field].map(formatter)
+
+    return rendered
+
+
+_COMPILED_CONCLUSION_TEMPLATE = compile_template(CONCLUSION_TEMPLATE)
+
+####################################################################################################
+# Vectorised conclusions
+
+
+def build_conclusions_table(results, indicator_details):
+    """
+    Joins regression results with indicator details and derives every conditional phrase.
+    Raises a KeyError if an indicator in results has no row in indicator_details.
+
+    Parameters:
+    - results: DataFrame with 'Indicator', 'R^2', 'Coefficient', 'P-Value', 'Durbin-Watson',
+      'JB Statistic' and 'JB P-Value' columns (one row per indicator).
+    - indicator_details: DataFrame indexed by indicator with 'Correlation' and 'Conclusion' columns.
+
+    Returns:
+    - DataFrame with one column per field of CONCLUSION_TEMPLATE.
+    """
+    # Every indicator needs its details, otherwise the phrases would be rendered from NaN
+    missing = ~results["Indicator"].isin(indicator_details.index)
+    if missing.any():
+        raise KeyError(f"no indicator details for {results.loc[missing, 'Indicator'].tolist()}")
+
+    details = indicator_details[["Correlation", "Conclusion"]]
+    merged = results.join(details, on="Indicator")
+
+    correlation = merged["Correlation"].to_numpy(dtype=float)
+    r2 = merged["R^2"].to_numpy(dtype=float)
+    p_value = merged["P-Value"].to_numpy(dtype=float)
+    durbin_watson = merged["Durbin-Watson"].to_numpy(dtype=float)
+    jb_p_value = merged["JB P-Value"].to_numpy(dtype=float)
+    significant = p_value < 0.05
+    stationary = (merged["Conclusion"] == "Stationary").to_numpy()
+    phrases = CONCLUSION_PHRASES
+
+    table = pd.DataFrame(
+        {
+            "indicator": merged["Indicator"].to_numpy(),
+            "correlation": correlation,
+            "correlation_strength": np.where(np.abs(correlation) > 0.5, *phrases["correlation_strength"]),
+            "r2": r2,
+            "r2_pct": r2 * 100,
+            "r2_strength": np.where(r2 > 0.5, *phrases["r2_strength"]),
+            "coefficient": merged["Coefficient"].to_numpy(dtype=float),
+            "coefficient_text": np.where(significant, *phrases["coefficient_text"]),
+            "p_value": p_value,
+            "p_value_text": np.where(significant, *phrases["p_value_text"]),
+            "stationarity": merged["Conclusion"].to_numpy(),
+            "stationarity_text": np.where(stationary, *phrases["stationarity_text"]),
+            "durbin_watson": durbin_watson,
+            "durbin_watson_text": np.where(
+                (durbin_watson > 1.5) & (durbin_watson < 2.5), *phrases["durbin_watson_text"]
+            ),
+            "jb_statistic": merged["JB Statistic"].to_numpy(dtype=float),
+            "jb_p_value": jb_p_value,
+            "jb_text": np.where(jb_p_value > 0.05, *phrases["jb_text"]),
+        },
+        index=merged.index,
+    )
+    return table
+
+
+@instrument
+def render_markdown_conclusions(results, indicator_details):
+    """
+    Renders the markdown conclusions for all indicators in a single pass.
+
+    Parameters:
+    - results: Regression results, see build_conclusions_table.
+    - indicator_details: Indicator details, see build_conclusions_table.
+
+    Returns:
+    - str: The concatenated markdown for every indicator.
+    """
+    table = build_conclusions_table(results, indicator_details)
+    return "".join(render_template(_COMPILED_CONCLUSION_TEMPLATE, table))
+
+
+# Cached conclusions sections are invalidated whenever the template or the phrases change
+render_markdown_conclusions.report_version = hash_inputs(CONCLUSION_TEMPLATE, CONCLUSION_PHRASES)
+
+####################################################################################################
+# Incremental report writer
+
+
+def build_report(sections, output=None, cache_dir=None):
+    """
+    Builds a markdown report section by section, reusing cached sections whose inputs are unchanged.
+
+    Parameters:
+    - sections: Iterable of (name, render_function, inputs) or (name, render_function, inputs,
+      version) tuples; each section is rendered as render_function(*inputs) and must return a
+      markdown string. Bump version whenever the render function's output changes for the same
+      inputs (e.g. an edited template) to invalidate its cached sections. If omitted, the
+      function's report_version attribute is used, as set on render_markdown_conclusions.
+    - output: File path or writable file object (defaults to stdout). Sections are streamed
+      to it as soon as they are ready.
+    - cache_dir: Directory holding rendered sections and their input digests. Sections are
+      stored under a hash of their name and listed by name in manifest.json. If None, every
+      section is rendered.
+
+    Returns:
+    - list: Names of the sections that were regenerated.
+    """
+    manifest = {}
+    manifest_path = None
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        manifest_path = os.path.join(cache_dir, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+
+    if output is None:
+        output = sys.stdout
+
+    if isinstance(output, (str, os.PathLike)):
+        handle = open(output, "w", encoding="utf-8")
+        write = handle.write
+    else:
+        write = output.write
+
+    regenerated = []
+    try:
+        for name, render_function, inputs, *version in sections:
+            version = version[0] if version else getattr(render_function, "report_version", None)
+
+            # The render function and its version are part of the key so swapping or editing it
+            # invalidates the cached section
+            function_name = f"{render_function.__module__}.{render_function.__qualname__}"
+            key = hash_inputs(function_name, version, *inputs)
+
+            # Section names can contain '/' or ':' (e.g. indicator names), so files are named by hash
+            section_file = hashlib.sha256(name.encode()).hexdigest()[:16] + ".md"
+            section_path = os.path.join(cache_dir, section_file) if cache_dir is not None else None
+
+            # Reuse the cached section if its inputs have not changed
+            cached = manifest.get(name)
+            if (
+                section_path is not None
+                and isinstance(cached, dict)
+                and cached.get("key") == key
+                and os.path.exists(section_path)
+            ):
+                with open(section_path, encoding="utf-8") as f:
+                    content = f.read()
+            else:
+                content = render_function(*inputs)
+                regenerated.append(name)
+                if section_path is not None:
+                    with open(section_path, "w", encoding="utf-8") as f:
+                        f.write(content)
+                    manifest[name] = {"file": section_file, "key": key}
+
+            write(content)
+    finally:
+        if isinstance(output, (str, os.PathLike)):
+            handle.close()
+
+    if manifest_path is not None:
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    return regenerated
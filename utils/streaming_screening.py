@@ -0,0 +1,108 @@
+# streaming_screening.py
+
+import csv
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import instrument, stage
+
+####################################################################################################
+# Out-of-core screening of candidate proxies against PCE.
+#
+# The CSV is read once, one chunk of rows at a time, so at most chunksize rows are in memory
+# whatever the length of the panel. Per series only six running sums and a missing count are
+# kept; the full table of statistics goes to stats_path and only the top_k are returned.
+
+
+def _pearson_from_sums(n, sx, sy, sxx, syy, sxy):
+    """
+    Pearson correlation from (shifted) running sums over pairwise complete observations.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sy
+        var_x = n * sxx - sx**2
+        var_y = n * syy - sy**2
+        return cov / np.sqrt(var_x * var_y)
+
+
+@instrument
+def screen_indicators(file_path, target="PCE", top_k=20, chunksize=1000, min_observations=10,
+                      stats_path=None, index_col=0):
+    """
+    Streams a wide CSV and ranks every series by its correlation with the target.
+
+    For each series this computes the Pearson correlation with the target, the R² of the
+    univariate regression of the target on the series (the squared correlation) and the number
+    of missing values. Spearman correlation needs global ranks and is not supported here.
+
+    Parameters:
+    - file_path: CSV with dates in the index column, the target and the candidate series.
+    - target: Name of the target column.
+    - top_k: Number of series to keep, ranked by absolute correlation.
+    - chunksize: Number of rows read at a time; a chunk holds chunksize x number of series values.
+    - min_observations: Series with fewer pairwise complete observations are skipped.
+    - stats_path: Optional CSV path for the statistics of every series, including the missing
+      value counts. Use it for the full report, only the top_k are returned.
+    - index_col: Position of the date column.
+
+    Returns:
+    - DataFrame of the top_k series with 'Correlation', 'R_squared', 'Observations' and 'Missing'.
+    """
+    # Read the header line directly, pandas is slow to set up an empty frame for wide files
+    with open(file_path, newline="") as f:
+        header = next(csv.reader(f))
+    index_name = header[index_col]
+    candidates = [column for column in header if column not in (index_name, target)]
+
+    k = len(candidates)
+    n, sx, sy, sxx, syy, sxy = (np.zeros(k) for _ in range(6))
+    missing = np.zeros(k, dtype=int)
+    shift_x = shift_y = None
+
+    with stage("screen_indicators.read"):
+        for chunk in pd.read_csv(file_path, chunksize=chunksize):
+            X = chunk[candidates].to_numpy(dtype=float)
+            y = chunk[target].to_numpy(dtype=float)
+
+            # Shift by the first chunk's means to keep the running sums numerically stable
+            if shift_x is None:
+                shift_x = np.nan_to_num(pd.DataFrame(X).mean().to_numpy())
+                shift_y = np.nan_to_num(pd.Series(y).mean())
+            X = X - shift_x
+            y = y - shift_y
+
+            observed = ~np.isnan(X)
+            missing += (~observed).sum(axis=0)
+
+            # Pairwise complete observations only; rows with a missing target drop out entirely
+            y_observed = ~np.isnan(y)
+            mask = observed & y_observed[:, None]
+            Xm = np.where(mask, X, 0.0)
+            ym = np.where(y_observed, y, 0.0)
+
+            n += mask.sum(axis=0)
+            sx += Xm.sum(axis=0)
+            sy += ym @ mask
+            sxx += (Xm**2).sum(axis=0)
+            syy += ym**2 @ mask
+            sxy += ym @ Xm
+
+    correlation = _pearson_from_sums(n, sx, sy, sxx, syy, sxy)
+    stats = pd.DataFrame(
+        {
+            "Correlation": correlation,
+            "R_squared": correlation**2,
+            "Observations": n.astype(int),
+            "Missing": missing,
+        },
+        index=pd.Index(candidates, name="Name"),
+    )
+
+    if stats_path is not None:
+        stats.to_csv(stats_path)
+
+    # Rank by absolute correlation among the series with enough observations
+    eligible = stats[(stats["Observations"] >= min_observations) & stats["Correlation"].notna()]
+    order = np.argsort(-eligible["Correlation"].abs().to_numpy(), kind="stable")[:top_k]
+    return eligible.iloc[order]
@@ -5,10 +5,13 @@ from pandas.tseries.offsets import MonthBegin
 import numpy as np
 import seaborn as sns
 
+from utils.instrumentation import instrument
+
 ####################################################################################################
 # Plot series with Extended Range and IQR and outliers
 
 
+@instrument
 def analyze_and_plot(df, column):
     """
     Function to standardize datetime index, compute statistics, and plot data from the given DataFrame.
@@ -0,0 +1,126 @@
+import numpy as np
+
+####################################################################################################
+# Largest-Triangle-Three-Buckets downsampling for long series
+
+
+def _lttb(x, y, n_out):
+    """
+    Plain Largest-Triangle-Three-Buckets selection of n_out points (3 <= n_out < len(x)).
+    """
+    n = len(x)
+
+    # Bucket boundaries for the points between the first and the last one
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(int) + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket (or the last point for the final bucket)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        # Pick the point forming the largest triangle with the previous pick and the next average
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Returns the indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept and, from n_out = 4 on, so are the global minimum
+    and maximum of y, so peaks and troughs survive the downsampling. At most max(n_out, 2)
+    points are returned.
+
+    Parameters:
+    - x: 1-d array of increasing x values (no NaNs).
+    - y: 1-d array of y values (no NaNs), same length as x.
+    - n_out: Target number of points.
+
+    Returns:
+    - numpy.ndarray of sorted integer indices into x and y.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+
+    if n_out >= n:
+        return np.arange(n)
+
+    endpoints = [0, n - 1]
+    if n_out < 4:
+        return np.unique(endpoints)
+
+    # Keep the global extremes so the visible range matches the full series; they take two of
+    # the n_out points, LTTB picks the rest
+    extremes = [int(np.argmin(y)), int(np.argmax(y))]
+    if n_out < 5:
+        return np.unique(endpoints + extremes)
+    return np.unique(np.concatenate([_lttb(x, y, n_out - 2), extremes]))
+
+
+def downsample_segments(x, y, n_out):
+    """
+    Splits a series at its NaN runs and downsamples each contiguous piece with lttb_indices.
+
+    Every piece gets two points and the rest of the n_out points are shared between the pieces
+    in proportion to their length, so gaps in the data stay gaps instead of being bridged by a
+    straight line and at most n_out points are kept in total. If there are more than n_out // 2
+    pieces, only the longest ones are kept.
+
+    Returns:
+    - list of (k, 2) numpy arrays of (x, y) points, one per contiguous piece, in order.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Start and end positions of every run of observed values
+    observed = np.concatenate([[False], ~np.isnan(y), [False]])
+    edges = np.flatnonzero(np.diff(observed.astype(int)))
+    starts, ends = edges[::2], edges[1::2]
+
+    # Drop the shortest pieces if there are too many to give each of them two points
+    lengths = ends - starts
+    if len(lengths) > n_out // 2:
+        keep = np.sort(np.argsort(-lengths, kind="stable")[:n_out // 2])
+        starts, ends, lengths = starts[keep], ends[keep], lengths[keep]
+
+    spare = n_out - 2 * len(lengths)
+    budgets = 2 + (spare * lengths / max(lengths.sum(), 1)).astype(int)
+
+    segments = []
+    for start, end, budget in zip(starts, ends, budgets):
+        idx = start + lttb_indices(x[start:end], y[start:end], budget)
+        segments.append(np.column_stack([x[idx], y[idx]]))
+    return segments
+
+
+def downsample_series(x, y, n_out):
+    """
+    Downsamples a series with downsample_segments, keeping a NaN between the pieces so that
+    plt.plot leaves the gaps open.
+
+    Returns:
+    - tuple of (x, y) numpy arrays.
+    """
+    segments = downsample_segments(x, y, n_out)
+    if not segments:
+        return np.array([]), np.array([])
+
+    gap = np.array([[np.nan, np.nan]])
+    points = np.concatenate([part for segment in segments for part in (segment, gap)][:-1])
+    return points[:, 0], points[:, 1]
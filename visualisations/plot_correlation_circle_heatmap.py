@@ -5,10 +5,13 @@ from pandas.tseries.offsets import MonthBegin
 import numpy as np
 import seaborn as sns
 
+from utils.instrumentation import instrument
+
 ####################################################################################################
 # inspect for colinearity
 
 
+@instrument
 def plot_correlation_circle_heatmap(
     dataset, correlations, top_n=20, fig_title="Correlation Circle Heatmap"
 ):
@@ -5,10 +5,13 @@ from pandas.tseries.offsets import MonthBegin
 import numpy as np
 import seaborn as sns
 
+from utils.instrumentation import instrument
+
 ####################################################################################################
 # plot top n and bottom n correlated series with PCE
 
 
+@instrument
 def plot_abs_correlations(correlation_series, top_n=10):
     """
     Plot the top and bottom N correlated indicators with PCE.
@@ -9,6 +9,9 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LinearRegression
 from sklearn.pipeline import make_pipeline
 
+from utils.instrumentation import instrument
+
+@instrument
 def train_and_predict(X_train, y_train, X_test,n_components=3):
     """
     Trains the model and makes predictions.
@@ -24,9 +27,13 @@ def train_and_predict(X_train, y_train, X_test,n_components=3):
     
     return pipeline, predicted_pce
 
-def plot_fan_chart(df_train, C, predicted_pce, X_train, y_train, start_date='2020-03-01'):
+@instrument
+def plot_fan_chart(df_train, C, predicted_pce, X_train, y_train, start_date='2020-03-01', pipeline=None):
     """
     Creates a fan chart to visualize actual vs. predicted PCE with uncertainty, starting from a specified date.
+
+    If a fitted pipeline is given (e.g. from train_and_predict_regularized), it is used for the
+    residuals instead of refitting the default PCA model.
     """
     # Filter the combined_actual_pce to start from the specified start_date
     start_date_dt = pd.to_datetime(start_date, format='%Y-%m-%d')
@@ -35,8 +42,9 @@ def plot_fan_chart(df_train, C, predicted_pce, X_train, y_train, start_date='202
     
     dates_for_plotting = combined_actual_pce.index  # Dates for plotting
     
-    # Train model and calculate residuals for the training data
-    pipeline, _ = train_and_predict(X_train, y_train, X_train.loc[df_train.index >= start_date_dt])
+    # Train model (unless one was given) and calculate residuals for the training data
+    if pipeline is None:
+        pipeline, _ = train_and_predict(X_train, y_train, X_train.loc[df_train.index >= start_date_dt])
     y_train_pred = pipeline.predict(X_train.loc[df_train.index >= start_date_dt])
     residuals = y_train.loc[df_train.index >= start_date_dt] - y_train_pred
     prediction_uncertainty_std = np.std(residuals)
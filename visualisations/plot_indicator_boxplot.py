@@ -1,12 +1,51 @@
 
 import plotly.express as px
+import plotly.graph_objects as go
 
-def plot_indicator_boxplot(long_data):
+from utils.instrumentation import instrument
+
+
+def compute_box_statistics(long_data):
+    """
+    Computes the box plot statistics of every indicator in bulk.
+
+    The whiskers follow plotly's default: the most extreme values within 1.5 IQR of the box.
+
+    Parameters:
+    - long_data: DataFrame with 'Group', 'Indicator' and 'Value' columns.
+
+    Returns:
+    - DataFrame indexed by (Group, Indicator) with q1, median, q3, lowerfence and upperfence columns.
+    """
+    data = long_data.dropna(subset=["Value"])
+    grouped = data.groupby(["Group", "Indicator"], sort=False)["Value"]
+
+    # Quartiles for all indicators at once
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ["q1", "median", "q3"]
+    iqr = stats["q3"] - stats["q1"]
+
+    # Whiskers end at the most extreme observations inside the 1.5 IQR fences
+    bounds = data.join((stats["q1"] - 1.5 * iqr).rename("low"), on=["Group", "Indicator"])
+    bounds = bounds.join((stats["q3"] + 1.5 * iqr).rename("high"), on=["Group", "Indicator"])
+    inside = bounds[(bounds["Value"] >= bounds["low"]) & (bounds["Value"] <= bounds["high"])]
+    inside = inside.groupby(["Group", "Indicator"], sort=False)["Value"]
+    stats["lowerfence"] = inside.min()
+    stats["upperfence"] = inside.max()
+
+    return stats
+
+
+@instrument
+def plot_indicator_boxplot(long_data, explorer=False, output_html=None):
     """
     Generates a box plot of indicators, categorized by economic groups.
 
     Parameters:
     - long_data: DataFrame containing the long-form data for indicators and groups.
+    - explorer: If True, the box statistics are computed up front and only those are sent to
+      plotly (one trace per group), so the figure stays small for the full monthly panel.
+    - output_html: Optional path; if given, the figure is written there instead of shown.
 
     The plot visualizes the distribution of indicator values, colored by their respective groups,
     and applies various customizations for readability and presentation.
@@ -14,22 +53,45 @@ def plot_indicator_boxplot(long_data):
     # Filter out any groups that don't have any data to avoid plotting issues
     filtered_groups = long_data.dropna(subset=["Value"])["Group"].unique()
 
-    # Generate box plot
-    fig = px.box(
-        long_data.dropna(subset=["Value"]),
-        x="Value",
-        y="Indicator",
-        color="Group",
-        category_orders={"Group": filtered_groups},
-        title="Box Plot with Group as Legend"
-    )
+    if explorer:
+        stats = compute_box_statistics(long_data)
+        colors = px.colors.qualitative.Plotly
+
+        # One precomputed box trace per group instead of the raw observations
+        fig = go.Figure()
+        for i, group in enumerate(filtered_groups):
+            group_stats = stats.loc[group]
+            fig.add_trace(
+                go.Box(
+                    y=group_stats.index,
+                    q1=group_stats["q1"],
+                    median=group_stats["median"],
+                    q3=group_stats["q3"],
+                    lowerfence=group_stats["lowerfence"],
+                    upperfence=group_stats["upperfence"],
+                    orientation="h",
+                    name=str(group),
+                    marker_color=colors[i % len(colors)],
+                )
+            )
+        fig.update_layout(title="Box Plot with Group as Legend")
+    else:
+        # Generate box plot
+        fig = px.box(
+            long_data.dropna(subset=["Value"]),
+            x="Value",
+            y="Indicator",
+            color="Group",
+            category_orders={"Group": filtered_groups},
+            title="Box Plot with Group as Legend"
+        )
 
     # Update layout
     fig.update_layout(
         yaxis_title="",
         xaxis_title="Value",
         legend_title="Group",
-        height=600,  
+        height=600,
         margin=dict(l=20, r=20, t=40, b=20)
     )
 
@@ -52,4 +114,7 @@ def plot_indicator_boxplot(long_data):
     # Remove outliers
     fig.update_traces(boxpoints=False)
 
-    fig.show()
\ No newline at end of file
+    if output_html:
+        fig.write_html(output_html, include_plotlyjs="cdn")
+    else:
+        fig.show()
@@ -1,27 +1,79 @@
+import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib import dates as mdates
+from matplotlib.collections import LineCollection
 
+from utils.instrumentation import instrument
+from visualisations.downsample import downsample_segments, downsample_series
 
-def plot_indicators_with_emphasis_on_pce(df, columns):
-    plt.figure(figsize=(10, 6))
 
-    # Calculate 4-month moving averages for all columns in df
-    df_ma = df.rolling(window=4).mean()
+@instrument
+def plot_indicators_with_emphasis_on_pce(df, columns, explorer=False, max_points=500):
+    """
+    Plots the 4-period moving average of all indicators against PCE.
+
+    Parameters:
+    - df: DataFrame containing the indicators and 'PCE'.
+    - columns: Columns to plot; 'PCE' is always drawn on top.
+    - explorer: If True, only the requested columns are smoothed, every series is downsampled
+      to at most max_points points and all indicators are drawn as a single LineCollection.
+      Use this for the full monthly panel.
+    - max_points: Maximum number of points per series in explorer mode.
+    """
+    plt.figure(figsize=(10, 6))
 
     # Extracting top features excluding 'PCE'
     top_features = [feature for feature in columns if feature != "PCE"]
 
-    # Plotting other indicators with lesser opacity using a lighter shade of red
-    for feature in top_features:
-        plt.plot(df_ma.index, df_ma[feature], label=f"{feature} vs. PCE", color="dodgerblue", linewidth=1, alpha=0.2)  # Lighter red with opacity
-    
-    # Plotting 'PCE' with more prominence
-    plt.plot(df_ma.index, df_ma['PCE'], label="PCE", color="#FF7F50", linewidth=2, alpha=1)  # Bright red, no opacity
+    if explorer:
+        # Calculate 4-month moving averages for the plotted columns only, in one pass
+        df_ma = df[top_features + ["PCE"]].rolling(window=4).mean()
+
+        # Matplotlib needs numeric x values for the collection
+        if isinstance(df_ma.index, pd.DatetimeIndex):
+            x = mdates.date2num(df_ma.index)
+        else:
+            x = np.arange(len(df_ma.index), dtype=float)
+        values = df_ma.to_numpy(dtype=float)
+
+        # Downsample every indicator, split at its gaps, and draw them all as one collection
+        segments = [
+            segment
+            for i in range(len(top_features))
+            for segment in downsample_segments(x, values[:, i], max_points)
+        ]
+        plt.gca().add_collection(
+            LineCollection(segments, colors="dodgerblue", linewidths=1, alpha=0.2, label="Indicators vs. PCE")
+        )
+
+        # Plotting 'PCE' with more prominence
+        pce_x, pce_y = downsample_series(x, values[:, -1], max_points)
+        plt.plot(pce_x, pce_y, label="PCE", color="#FF7F50", linewidth=2, alpha=1)
+        plt.gca().autoscale_view()
+
+        if isinstance(df_ma.index, pd.DatetimeIndex):
+            plt.gca().xaxis_date()
+            plt.xticks(fontsize=10, rotation=45, color='grey')
+        else:
+            plt.xticks(x[::20], df_ma.index[::20], fontsize=10, rotation=45, color='grey')
+    else:
+        # Calculate 4-month moving averages for all columns in df
+        df_ma = df.rolling(window=4).mean()
+
+        # Plotting other indicators with lesser opacity using a lighter shade of red
+        for feature in top_features:
+            plt.plot(df_ma.index, df_ma[feature], label=f"{feature} vs. PCE", color="dodgerblue", linewidth=1, alpha=0.2)  # Lighter red with opacity
+
+        # Plotting 'PCE' with more prominence
+        plt.plot(df_ma.index, df_ma['PCE'], label="PCE", color="#FF7F50", linewidth=2, alpha=1)  # Bright red, no opacity
+
+        plt.xticks(df_ma.index[::20], fontsize=10, rotation=45,color='grey')  # Adjust for visibility
 
     # Styling
     plt.title("All Indicators Against PCE (4-Month Moving Average)", fontsize=16)
     plt.xlabel("Date", fontsize=10,color='grey')
     plt.ylabel("Value", fontsize=10,color='grey')
-    plt.xticks(df_ma.index[::20], fontsize=10, rotation=45,color='grey')  # Adjust for visibility
     plt.yticks(fontsize=10,color='grey')
     plt.grid(True, which='both', linestyle='--', linewidth=0.5)
     plt.tight_layout()
@@ -34,10 +86,10 @@ def plot_indicators_with_emphasis_on_pce(df, columns):
     ax.spines['bottom'].set_linestyle('--')
     ax.spines['left'].set_color('gray')
     ax.spines['left'].set_linestyle('--')
-    
+
     #remove grid
     ax.grid(False)
-    
+
     #make y and x axis labels and title grey
     ax.yaxis.label.set_color('grey')
     ax.xaxis.label.set_color('grey')
@@ -45,4 +97,4 @@ def plot_indicators_with_emphasis_on_pce(df, columns):
     #set y-axis range
     plt.ylim(-20, 20)
 
-    plt.show()
\ No newline at end of file
+    plt.show()
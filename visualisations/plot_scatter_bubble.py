@@ -1,6 +1,9 @@
 import plotly.express as px
 
+from utils.instrumentation import instrument
 
+
+@instrument
 def plot_scatter_bubble(comparison_df):
 # Now let's create the bubble chart with groups
     fig = px.scatter(
@@ -1,6 +1,9 @@
 import matplotlib.pyplot as plt
 import numpy as np
 
+from utils.instrumentation import instrument
+
+@instrument
 def plot_skree(pca):
 
     #  'pca.explained_variance_ratio_' is  PCA explained variance ratio array
@@ -1,7 +1,10 @@
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from utils.instrumentation import instrument
 
+
+@instrument
 def plot_top_correlations_barchart(r2_values_sorted,top_n=20):
     """
     Plot a bar chart of the top N variables with the highest R^2 values.
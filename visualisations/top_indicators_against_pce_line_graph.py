@@ -5,6 +5,9 @@ from pandas.tseries.offsets import MonthBegin
 import numpy as np
 import seaborn as sns
 
+from utils.instrumentation import instrument
+
+@instrument
 def top_indicators_against_pce_line_graph(df, top_correlations, top_n=10):
     """
     Plots line graphs of the top N correlated features against PCE.
@@ -1,6 +1,9 @@
 import pandas as pd
 import plotly.express as px
 
+from utils.instrumentation import instrument
+
+@instrument
 def vif_bar_chart(vif_data):
     
     vif_data_sorted = vif_data.sort_values("VIF", ascending=False)